@@ -0,0 +1,74 @@
+"""
+Response caching helpers for API endpoints
+"""
+from functools import wraps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .serializers import serialize_user
+
+User = get_user_model()
+
+# Seconds a serialized user payload is kept. post_save only clears the
+# local process cache; other workers notice changes through the
+# updated_at stamp, which every save touching a payload field bumps
+USER_PAYLOAD_CACHE_TIMEOUT = 300
+
+
+def _user_payload_key(user_id):
+    return f'user_payload:{user_id}'
+
+
+def get_user_payload(user):
+    """
+    Return the serialized user (see serialize_user), cached per user.
+    The entry is stamped with updated_at/last_login so writes that bypass
+    save() (queryset updates) still invalidate it.
+    """
+    key = _user_payload_key(user.pk)
+    stamp = (user.updated_at, user.last_login)
+    
+    cached = cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
+    data = serialize_user(user)
+    cache.set(key, (stamp, data), USER_PAYLOAD_CACHE_TIMEOUT)
+    return data
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_payload(sender, instance, **kwargs):
+    """Drop the cached payload whenever the user is saved"""
+    cache.delete(_user_payload_key(instance.pk))
+
+
+def revalidate(etag_func):
+    """
+    Conditional GET for a DRF function view: answer 304 when the client's
+    If-None-Match still matches etag_func(request, *args, **kwargs).
+    Responses are marked "private, no-cache" so browsers keep them but
+    always check back instead of serving a stale copy.
+    Apply below @api_view so it runs after authentication.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func)(view)
+        
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return inner
+    return decorator
+
+
+def user_etag(request):
+    """ETag for the current user's payload; see get_user_payload's stamp"""
+    user = request.user
+    last_login = user.last_login.timestamp() if user.last_login else 0
+    return f'user-{user.pk}-{user.updated_at.timestamp()}-{last_login}'
@@ -0,0 +1,24 @@
+"""
+Pagination classes for API list endpoints
+"""
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class ScanCursorPagination(CursorPagination):
+    """Keyset pagination over a user's scans, newest first"""
+    ordering = '-created_at'
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        """
+        Keep the `scans` key of the unpaginated list. There is no `count`:
+        there it means the user's total, which keyset pages don't compute
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'scans': data
+        })
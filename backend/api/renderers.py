@@ -0,0 +1,20 @@
+"""
+Renderers for API responses
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class OrjsonRenderer(JSONRenderer):
+    """JSON renderer backed by orjson's C encoder"""
+    options = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+    # DRF's encoder covers the types orjson doesn't (Decimal, lazy strings, querysets...)
+    _fallback = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON bytes"""
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self._fallback, option=self.options)
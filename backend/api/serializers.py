@@ -1,21 +1,71 @@
 """
 Serializers for API endpoints
 """
-from core.models import Scan
 import os
+import threading
+from copy import copy
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.password_validation import get_default_password_validators, validate_password
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
 User = get_user_model()
 
+_fields_cache_lock = threading.Lock()
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+# Seconds a taken registration email is remembered. Only positives are
+# cached; a free email is always rechecked against the database
+EMAIL_EXISTS_CACHE_TIMEOUT = 30
+
+EMAIL_TAKEN_MESSAGE = "This email is already registered. Please sign in or use a different email."
+
+
+def _email_exists_cache_key(email):
+    return f'email_exists:{email.lower()}'
+
+
+_PASSWORD_VALIDATORS = get_default_password_validators()
+
+
+def _validate_password(value):
+    """Run AUTH_PASSWORD_VALIDATORS using the instances built at import"""
+    return validate_password(value, password_validators=_PASSWORD_VALIDATORS)
+
+
+# Scan upload limits
+_IMAGE_EXTS_ALLOWED = ('.jpg', '.jpeg', '.png', '.dcm', '.dicom')
+_VALID_IMAGE_EXTS = frozenset(_IMAGE_EXTS_ALLOWED)
+_VALID_IMAGE_EXTS_DISPLAY = ', '.join(_IMAGE_EXTS_ALLOWED)
+_MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+
+class CachedFieldsSerializerMixin:
+    """
+    Build a serializer's fields once per class and hand out shallow copies,
+    instead of regenerating and deep-copying them on every instantiation
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = self.__class__
+        cached = self._fields_cache.get(cls)
+        if cached is None:
+            with _fields_cache_lock:
+                cached = self._fields_cache.get(cls)
+                if cached is None:
+                    cached = super().get_fields()
+                    self._fields_cache[cls] = cached
+        return {name: copy(field) for name, field in cached.items()}
+
+
+class UserRegistrationSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """Serializer for user registration"""
     password = serializers.CharField(
         write_only=True,
         required=True,
-        validators=[validate_password],
+        validators=[_validate_password],
         style={'input_type': 'password'}
     )
     password_confirm = serializers.CharField(
@@ -31,6 +81,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             'first_name', 'last_name', 'age', 'gender',
             'country', 'occupation', 'role'
         ]
+        # Uniqueness is checked (and cached) in validate_email
+        extra_kwargs = {'email': {'validators': []}}
 
     def validate(self, attrs):
         """Validate that passwords match"""
@@ -42,8 +94,10 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def validate_email(self, value):
         """Check if email already exists"""
-        if User.objects.filter(email=value.lower()).exists():
-            raise serializers.ValidationError("This email is already registered. Please sign in or use a different email.")
+        key = _email_exists_cache_key(value)
+        if cache.get(key) or User.objects.filter(email=value.lower()).exists():
+            cache.set(key, True, EMAIL_EXISTS_CACHE_TIMEOUT)
+            raise serializers.ValidationError(EMAIL_TAKEN_MESSAGE)
         return value.lower()
     
     def validate_age(self, value):
@@ -59,24 +113,20 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         # Remove password_confirm as it's not a model field
         validated_data.pop('password_confirm')
         
-        # Create user using the manager's create_user method
-        user = User.objects.create_user(**validated_data)
+        # Create user using the manager's create_user method. The unique
+        # constraint still decides a race between two sign-ups for one email
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(**validated_data)
+        except IntegrityError:
+            cache.set(_email_exists_cache_key(validated_data['email']), True, EMAIL_EXISTS_CACHE_TIMEOUT)
+            raise serializers.ValidationError({'email': [EMAIL_TAKEN_MESSAGE]})
         return user
 
 
-class UserLoginSerializer(serializers.Serializer):
-    """Serializer for user login"""
-    email = serializers.EmailField(required=True)
-    password = serializers.CharField(
-        required=True,
-        write_only=True,
-        style={'input_type': 'password'}
-    )
-
-
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """Serializer for user data (responses)"""
-    full_name = serializers.SerializerMethodField()
+    full_name = serializers.CharField(source='get_full_name', read_only=True)
     
     class Meta:
         model = User
@@ -87,10 +137,13 @@ class UserSerializer(serializers.ModelSerializer):
             'created_at', 'last_login'
         ]
         read_only_fields = ['id', 'created_at', 'last_login', 'email_verified']
-    
-    def get_full_name(self, obj):
-        """Get user's full name"""
-        return obj.get_full_name()
+
+
+# Model columns UserSerializer reads, plus updated_at which stamps the
+# cached payload; for .only() on paths that return it
+USER_PAYLOAD_FIELDS = tuple(
+    f for f in UserSerializer.Meta.fields if f != 'full_name'
+) + ('updated_at',)
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -99,7 +152,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(
         required=True,
         write_only=True,
-        validators=[validate_password]
+        validators=[_validate_password]
     )
     new_password_confirm = serializers.CharField(required=True, write_only=True)
     
@@ -112,7 +165,7 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
 
 
-class UpdateProfileSerializer(serializers.ModelSerializer):
+class UpdateProfileSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """Serializer for updating user profile"""
     
     class Meta:
@@ -146,42 +199,6 @@ class Disable2FASerializer(serializers.Serializer):
     password = serializers.CharField(required=True, write_only=True)
 
 
-class ScanSerializer(serializers.ModelSerializer):
-    """Serializer for scan data with enhanced lead analysis"""
-    user_email = serializers.EmailField(source='user.email', read_only=True)
-    user_name = serializers.SerializerMethodField()
-    lead_analysis = serializers.SerializerMethodField()
-    enhanced_interpretation = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = Scan
-        fields = [
-            'id', 'user', 'user_email', 'user_name',
-            'image_path', 'attention_map_path', 'report_path',
-            'risk_level', 'confidence_score', 'prediction_result',
-            'notes', 'processing_time', 'report_generated',
-            'deleted_by_user', 'deleted_at', 'created_at', 'updated_at',
-            'lead_analysis', 'enhanced_interpretation'
-        ]
-        read_only_fields = [
-            'id', 'user', 'created_at', 'updated_at',
-            'attention_map_path', 'report_path', 'report_generated',
-            'deleted_by_user', 'deleted_at', 'lead_analysis', 'enhanced_interpretation'
-        ]
-    
-    def get_user_name(self, obj):
-        """Get user's full name"""
-        return obj.user.get_full_name()
-    
-    def get_lead_analysis(self, obj):
-        """Get lead analysis from prediction_result"""
-        return obj.prediction_result.get('lead_analysis', {})
-    
-    def get_enhanced_interpretation(self, obj):
-        """Get enhanced interpretation with lead insights"""
-        return obj.prediction_result.get('interpretation', {})
-
-
 class ScanUploadSerializer(serializers.Serializer):
     """Serializer for scan image upload"""
     image = serializers.ImageField(required=True)
@@ -190,31 +207,111 @@ class ScanUploadSerializer(serializers.Serializer):
     def validate_image(self, value):
         """Validate image file"""
         # Check file size (max 10MB)
-        if value.size > 10 * 1024 * 1024:
+        if value.size > _MAX_IMAGE_BYTES:
             raise serializers.ValidationError("Image file too large. Maximum size is 10MB.")
         
         # Check file extension
-        valid_extensions = ['.jpg', '.jpeg', '.png', '.dcm', '.dicom']
         ext = os.path.splitext(value.name)[1].lower()
         
-        if ext not in valid_extensions:
+        if ext not in _VALID_IMAGE_EXTS:
             raise serializers.ValidationError(
-                f"Unsupported file type. Allowed types: {', '.join(valid_extensions)}"
+                f"Unsupported file type. Allowed types: {_VALID_IMAGE_EXTS_DISPLAY}"
             )
         
         return value
 
 
-class ScanListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for scan list"""
-    user_name = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = Scan
-        fields = [
-            'id', 'user_name', 'risk_level', 'confidence_score',
-            'report_generated', 'created_at'
-        ]
-    
-    def get_user_name(self, obj):
-        return obj.user.get_full_name()
\ No newline at end of file
+# ==================== READ-ONLY SCAN PAYLOADS ====================
+
+def _datetime_repr(value):
+    """Render a datetime the same way DRF's DateTimeField does"""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+# Columns serialize_scan_list reads, for .values() on list queries
+SCAN_LIST_COLUMNS = ('id', 'risk_level', 'confidence_score', 'report_generated', 'created_at')
+
+
+def serialize_scan_list(row, user_name):
+    """
+    Scan list payload (id, user_name, risk_level, confidence_score,
+    report_generated, created_at) from a .values(*SCAN_LIST_COLUMNS) row.
+    Lists are per owner, so the owner's name is passed in rather than
+    joined onto every row.
+    """
+    return {
+        'id': row['id'],
+        'user_name': user_name,
+        'risk_level': row['risk_level'],
+        'confidence_score': float(row['confidence_score']),
+        'report_generated': row['report_generated'],
+        'created_at': _datetime_repr(row['created_at']),
+    }
+
+
+def serialize_scan(scan):
+    """
+    Scan detail payload: the scan's columns, the owner's email and name,
+    and lead_analysis/enhanced_interpretation lifted out of prediction_result
+    """
+    prediction_result = scan.prediction_result
+    return {
+        'id': scan.id,
+        'user': scan.user_id,
+        'user_email': scan.user.email,
+        'user_name': scan.user.get_full_name(),
+        'image_path': scan.image_path.name,
+        'attention_map_path': scan.attention_map_path,
+        # An empty FileField is '', but the API has always sent null
+        'report_path': scan.report_path.name or None,
+        'risk_level': scan.risk_level,
+        'confidence_score': float(scan.confidence_score),
+        'prediction_result': prediction_result,
+        'notes': scan.notes,
+        'processing_time': float(scan.processing_time),
+        'report_generated': scan.report_generated,
+        'deleted_by_user': scan.deleted_by_user,
+        'deleted_at': _datetime_repr(scan.deleted_at),
+        'created_at': _datetime_repr(scan.created_at),
+        'updated_at': _datetime_repr(scan.updated_at),
+        'lead_analysis': prediction_result.get('lead_analysis', {}),
+        'enhanced_interpretation': prediction_result.get('interpretation', {}),
+    }
+
+
+# ==================== READ-ONLY USER PAYLOADS ====================
+
+def serialize_user(user):
+    """Build the UserSerializer payload directly, for auth responses"""
+    return {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': user.get_full_name(),
+        'age': user.age,
+        'gender': user.gender,
+        'country': user.country,
+        'occupation': user.occupation,
+        'role': user.role,
+        'primary_use_case': user.primary_use_case,
+        'two_fa_enabled': user.two_fa_enabled,
+        'email_verified': user.email_verified,
+        'created_at': _datetime_repr(user.created_at),
+        'last_login': _datetime_repr(user.last_login),
+    }
+
+
+def serialize_user_summary(user):
+    """Identity fields only, for login responses; clients fetch /auth/me/ for the rest"""
+    return {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'role': user.role,
+    }
@@ -0,0 +1,107 @@
+"""
+Background work run off the request thread
+
+Reports render on a thread pool inside the web process. Who is rendering
+a scan's report is claimed on the scan row (report_started_at), so the
+claim holds across worker processes; only the "failed" note for a queued
+render lives in the cache.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Scan
+from core.report_generator import ScanReportGenerator
+
+logger = logging.getLogger(__name__)
+
+# PDF rendering is CPU-bound; keep it to a couple of threads per process
+_report_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='report')
+
+# Seconds a render claim or failed state holds. A claim outliving a
+# crashed worker expires instead of blocking the scan forever
+REPORT_STATUS_TIMEOUT = 600
+
+REPORT_PENDING = 'pending'
+REPORT_FAILED = 'failed'
+
+
+def _report_failed_key(scan_id):
+    return f'report_failed:{scan_id}'
+
+
+def _claim_is_live(started_at):
+    return started_at is not None and timezone.now() - started_at < timedelta(seconds=REPORT_STATUS_TIMEOUT)
+
+
+def get_report_status(scan):
+    """
+    Return REPORT_PENDING, REPORT_FAILED or None if nothing is queued.
+    scan needs report_started_at loaded.
+    """
+    if _claim_is_live(scan.report_started_at):
+        return REPORT_PENDING
+    return cache.get(_report_failed_key(scan.id))
+
+
+def claim_report(scan_id):
+    """
+    Mark a scan's report as being rendered. Returns False if a render is
+    already in progress. The conditional UPDATE is
+    atomic in the database, so two requests, on any workers, never render
+    the same scan at once.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=REPORT_STATUS_TIMEOUT)
+    claimed = Scan.objects.filter(
+        Q(report_started_at__isnull=True) | Q(report_started_at__lt=stale),
+        id=scan_id
+    ).update(report_started_at=now)
+
+    if claimed:
+        cache.delete(_report_failed_key(scan_id))
+    return bool(claimed)
+
+
+def release_report(scan_id):
+    """Drop a claim taken with claim_report, e.g. after a failed render"""
+    Scan.objects.filter(id=scan_id).update(report_started_at=None)
+
+
+def generate_report_task(scan_id):
+    """Render the PDF for a scan and record its path"""
+    try:
+        scan = Scan.objects.select_related('user').get(id=scan_id)
+        report_path = ScanReportGenerator(scan).generate_report()
+        
+        # update() rather than save() so concurrent edits to other
+        # fields of the scan aren't overwritten
+        Scan.objects.filter(id=scan_id).update(
+            report_path=report_path,
+            report_generated=True,
+            report_started_at=None,
+            updated_at=timezone.now()
+        )
+    except Exception:
+        logger.exception("Report generation failed for scan %s", scan_id)
+        release_report(scan_id)
+        cache.set(_report_failed_key(scan_id), REPORT_FAILED, REPORT_STATUS_TIMEOUT)
+    finally:
+        # Worker threads hold their own connection; don't leak it
+        connection.close()
+
+
+def enqueue_report(scan_id):
+    """
+    Queue report generation for a scan. Returns False if a report for
+    this scan is already pending, so duplicate requests don't render twice.
+    """
+    if not claim_report(scan_id):
+        return False
+
+    _report_executor.submit(generate_report_task, scan_id)
+    return True
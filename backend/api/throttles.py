@@ -0,0 +1,77 @@
+"""
+Request throttles for unauthenticated auth endpoints
+"""
+import hashlib
+from collections.abc import Mapping
+
+from django.core.cache import cache
+from rest_framework.throttling import SimpleRateThrottle
+
+# Failed password attempts allowed per account within the window before
+# login_user stops checking passwords for it
+LOGIN_FAILURE_LIMIT = 10
+LOGIN_FAILURE_WINDOW = 900
+
+
+def _email_ident(email):
+    """Hash so raw addresses don't end up in cache keys"""
+    return hashlib.blake2b(email.strip().lower().encode(), digest_size=16).hexdigest()
+
+
+class AuthIPThrottle(SimpleRateThrottle):
+    """Per-client-IP limit on the public auth endpoints"""
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
+
+
+class AuthEmailThrottle(SimpleRateThrottle):
+    """
+    Per-account limit keyed on the posted email, so spreading guesses over
+    many IPs doesn't help. Requests without an email aren't throttled here.
+    """
+    scope = 'auth_email'
+
+    def get_cache_key(self, request, view):
+        # A JSON array body has no email; let the view reject it
+        if not isinstance(request.data, Mapping):
+            return None
+        
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email.strip():
+            return None
+        
+        return self.cache_format % {'scope': self.scope, 'ident': _email_ident(email)}
+
+
+class AuthCodeThrottle(AuthEmailThrottle):
+    """Per-account limit for endpoints that check a 6-digit or TOTP code"""
+    scope = 'auth_code'
+
+
+def _login_failure_key(email):
+    return f'login_failures:{_email_ident(email)}'
+
+
+def login_locked_out(email):
+    """True once an account has hit LOGIN_FAILURE_LIMIT failed passwords"""
+    return cache.get(_login_failure_key(email), 0) >= LOGIN_FAILURE_LIMIT
+
+
+def record_login_failure(email):
+    """Count a failed password; the window starts at the first failure"""
+    key = _login_failure_key(email)
+    if not cache.add(key, 1, LOGIN_FAILURE_WINDOW):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(key, 1, LOGIN_FAILURE_WINDOW)
+
+
+def clear_login_failures(email):
+    cache.delete(_login_failure_key(email))
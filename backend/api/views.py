@@ -3,49 +3,110 @@ API Views for authentication and user management
 """
 import requests
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import Count, Max, Q
+from django.urls import reverse
 from django.utils import timezone
 import os
+import hashlib
+import logging
+from collections.abc import Mapping
 from django.conf import settings
+from django.core.files.move import file_move_safe
 from django.core.files.storage import default_storage
-from core.models import Scan
-import uuid
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+from core.models import EmailVerificationCode, PasswordResetCode, Scan
+import secrets
 from datetime import date, timedelta
 from core.report_generator import ScanReportGenerator
 from django.views.decorators.csrf import csrf_exempt
 from utils.validators import validate_password_strength
+from utils.email_utils import (
+    generate_6_digit_code,
+    send_email_in_background,
+    send_verification_code_email,
+    send_password_reset_email
+)
 
 
 from .serializers import (
     UserRegistrationSerializer,
-    UserLoginSerializer,
     UserSerializer,
     ChangePasswordSerializer,
     UpdateProfileSerializer,
     Enable2FASerializer,
     Verify2FASerializer,
     Disable2FASerializer,
-    ScanSerializer,
     ScanUploadSerializer,
-    ScanListSerializer
+    serialize_scan,
+    serialize_scan_list,
+    serialize_user_summary,
+    SCAN_LIST_COLUMNS,
+    USER_PAYLOAD_FIELDS
+)
+from .caching import get_user_payload, revalidate, user_etag
+from .pagination import ScanCursorPagination
+from .throttles import (
+    AuthCodeThrottle,
+    AuthEmailThrottle,
+    AuthIPThrottle,
+    clear_login_failures,
+    login_locked_out,
+    record_login_failure
+)
+from .tasks import (
+    REPORT_FAILED,
+    REPORT_PENDING,
+    claim_report,
+    enqueue_report,
+    get_report_status,
+    release_report
 )
-from core.auth import generate_access_token, generate_refresh_token, get_user_from_token
+from core.auth import (
+    generate_access_token,
+    generate_refresh_token,
+    consume_refresh_token,
+    revoke_refresh_token,
+    record_login
+)
+from core.google_oauth import get_google_userinfo, request_google_userinfo
 from core.two_factor import (
     generate_totp_secret,
-    get_totp_uri,
-    generate_qr_code,
-    verify_totp_token,
+    get_cached_qr_code,
+    get_qr_code,
+    consume_totp_token,
     generate_backup_codes
 )
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+
+def _prefers(request, preference):
+    """True if the client's Prefer header (RFC 7240) asks for preference"""
+    prefer = request.headers.get('Prefer', '')
+    return preference in (p.strip() for p in prefer.split(','))
+
+
+def _login_payload(request, user):
+    """
+    User part of a login response: a short summary, or the full payload
+    when the client sends "Prefer: return=representation"
+    """
+    if _prefers(request, 'return=representation'):
+        return get_user_payload(user)
+    return serialize_user_summary(user)
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle])
 def register_user(request):
     """
     Register a new user
@@ -61,24 +122,18 @@ def register_user(request):
     serializer = UserRegistrationSerializer(data=request.data)
     
     if serializer.is_valid():
-        user = serializer.save()
-        
-        user.is_active = False
-        user.email_verified = False
-        user.save(update_fields=['is_active', 'email_verified'])
+        # Inactive until the email is verified; set on the INSERT itself
+        user = serializer.save(is_active=False, email_verified=False)
 
         # Create verification code record
-        from utils.email_utils import generate_6_digit_code, send_verification_code_email
-        from core.models import EmailVerificationCode
-
         code = generate_6_digit_code()
         ev = EmailVerificationCode.objects.create(user=user, code=code)
-        # Send email (this uses your SMTP credentials from env)
-        send_verification_code_email(user.email, code)
+        # Send email in the background (this uses your SMTP credentials from env)
+        send_email_in_background(send_verification_code_email, user.email, code)
 
         return Response({
             'message': 'User registered successfully. A verification code has been sent to your email.',
-            'user': UserSerializer(user).data
+            'user': get_user_payload(user)
         }, status=status.HTTP_201_CREATED)
     
     # If validation fails, return errors
@@ -86,14 +141,13 @@ def register_user(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthCodeThrottle])
 def verify_email(request):
     """
     Verify 6-digit email code
     POST /api/auth/verify-email/
     body: { "email": "...", "code": "123456" }
     """
-    print(f"Verify email called with data: {request.data}")
-    
     email = request.data.get('email')
     code = request.data.get('code')
 
@@ -104,22 +158,21 @@ def verify_email(request):
         )
 
     try:
-        user = User.objects.get(email=email.lower())
+        user = User.objects.only('id', 'email_verified', 'is_active').get(email=email.lower())
     except User.DoesNotExist:
         return Response(
             {'error': 'User not found.'}, 
             status=status.HTTP_404_NOT_FOUND
         )
 
-    # Find the latest matching code for this user
-    from core.models import EmailVerificationCode
-    ev = EmailVerificationCode.objects.filter(
-        user=user, 
-        code=code, 
-        used=False
-    ).order_by('-created_at').first()
-
-    if not ev:
+    # Resending supersedes older codes, so a user has at most one active code
+    try:
+        ev = EmailVerificationCode.objects.get(
+            user=user, 
+            code=code, 
+            used=False
+        )
+    except EmailVerificationCode.DoesNotExist:
         return Response(
             {'error': 'Invalid code.'}, 
             status=status.HTTP_400_BAD_REQUEST
@@ -131,13 +184,12 @@ def verify_email(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Mark as used and verify user
-    ev.used = True
-    ev.save(update_fields=['used'])
+    # Codes are single-use: once verified the user needs none of them
+    EmailVerificationCode.objects.filter(user=user).delete()
 
     user.email_verified = True
     user.is_active = True
-    user.save(update_fields=['email_verified', 'is_active'])
+    user.save(update_fields=['email_verified', 'is_active', 'updated_at'])
 
     return Response(
         {'message': 'Email verified successfully.'}, 
@@ -147,6 +199,7 @@ def verify_email(request):
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthEmailThrottle])
 def resend_verification(request):
     """
     Resend verification code to user's email
@@ -158,50 +211,73 @@ def resend_verification(request):
         return Response({'error': 'Email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        user = User.objects.get(email=email.lower())
+        user = User.objects.only('id', 'email', 'email_verified').get(email=email.lower())
     except User.DoesNotExist:
         return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
 
     if user.email_verified:
         return Response({'message': 'Email already verified.'}, status=status.HTTP_200_OK)
 
-    from utils.email_utils import generate_6_digit_code, send_verification_code_email
-    from core.models import EmailVerificationCode
-
+    # Drop any outstanding code before issuing a new one
+    EmailVerificationCode.objects.filter(user=user, used=False).delete()
     code = generate_6_digit_code()
     EmailVerificationCode.objects.create(user=user, code=code)
-    send_verification_code_email(user.email, code)
+    send_email_in_background(send_verification_code_email, user.email, code)
 
     return Response({'message': 'Verification code resent.'}, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthEmailThrottle])
 def login_user(request):
     """
     Login user with email and password
     POST /api/auth/login/
+    Send "Prefer: return=representation" to get the full user object back
     """
-    serializer = UserLoginSerializer(data=request.data)
+    data = request.data if isinstance(request.data, Mapping) else {}
+    email = data.get('email')
+    password = data.get('password')
     
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(email, str) or not isinstance(password, str) or not email.strip() or not password:
+        return Response({
+            'error': 'Email and password are required'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    email = serializer.validated_data['email'].lower()
-    password = serializer.validated_data['password']
+    email = email.strip().lower()
     
-    # Authenticate user
-    user = authenticate(request, username=email, password=password)
+    # Too many recent failures: refuse before spending a query and a hash
+    if login_locked_out(email):
+        return Response({
+            'error': 'Too many failed login attempts. Please try again later.'
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    # One lookup, narrowed to what the checks and the response payload read
+    user = User.objects.only(
+        *USER_PAYLOAD_FIELDS, 'password', 'is_active'
+    ).filter(email=email).first()
     
     if user is None:
+        # Run the hasher anyway so response time doesn't reveal the account exists
+        make_password(password)
+        record_login_failure(email)
+        return Response({
+            'error': 'Invalid email or password'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    
+    # Password first, so only the owner learns the account is inactive
+    if not user.check_password(password):
+        record_login_failure(email)
         return Response({
             'error': 'Invalid email or password'
         }, status=status.HTTP_401_UNAUTHORIZED)
     
-    # COMMENTED OUT - Temporarily disable email verification check
+    clear_login_failures(email)
+    
     if not user.is_active:
-         return Response({
-             'error': 'Account is inactive'
-         }, status=status.HTTP_403_FORBIDDEN)
+        return Response({
+            'error': 'Account is inactive'
+        }, status=status.HTTP_403_FORBIDDEN)
     
     # Check if 2FA is enabled
     if user.two_fa_enabled:
@@ -216,12 +292,11 @@ def login_user(request):
     refresh_token = generate_refresh_token(user)
     
     # Update last login
-    user.last_login = timezone.now()
-    user.save(update_fields=['last_login'])
+    record_login(user)
     
     return Response({
         'message': 'Login successful',
-        'user': UserSerializer(user).data,
+        'user': _login_payload(request, user),
         'tokens': {
             'access': access_token,
             'refresh': refresh_token
@@ -231,6 +306,7 @@ def login_user(request):
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthEmailThrottle])
 def forgot_password(request):
     """
     Send password reset code to user's email
@@ -243,7 +319,7 @@ def forgot_password(request):
         return Response({'error': 'Email is required'}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        user = User.objects.get(email=email.lower())
+        user = User.objects.only('id', 'email').get(email=email.lower())
     except User.DoesNotExist:
         # Don't reveal if email exists (security)
         return Response({
@@ -251,9 +327,6 @@ def forgot_password(request):
         }, status=status.HTTP_200_OK)
     
     # Generate reset code
-    from utils.email_utils import generate_6_digit_code, send_password_reset_email
-    from core.models import PasswordResetCode
-    
     code = generate_6_digit_code()
     
     # Delete any existing unused codes for this user
@@ -262,8 +335,8 @@ def forgot_password(request):
     # Create new reset code
     PasswordResetCode.objects.create(user=user, code=code)
     
-    # Send email
-    send_password_reset_email(user.email, code)
+    # Send email in the background
+    send_email_in_background(send_password_reset_email, user.email, code)
     
     return Response({
         'message': 'If an account exists with this email, a reset code has been sent.'
@@ -272,6 +345,7 @@ def forgot_password(request):
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthCodeThrottle])
 def reset_password(request):
     """
     Reset password using code
@@ -293,19 +367,18 @@ def reset_password(request):
         return Response({'error': error_msg}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        user = User.objects.get(email=email.lower())
+        user = User.objects.only('id', 'password').get(email=email.lower())
     except User.DoesNotExist:
         return Response({'error': 'Invalid code'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Find valid reset code
-    from core.models import PasswordResetCode
-    reset_code = PasswordResetCode.objects.filter(
-        user=user, 
-        code=code, 
-        used=False
-    ).order_by('-created_at').first()
-    
-    if not reset_code:
+    # forgot_password replaces older codes, so at most one is active
+    try:
+        reset_code = PasswordResetCode.objects.get(
+            user=user, 
+            code=code, 
+            used=False
+        )
+    except PasswordResetCode.DoesNotExist:
         return Response({'error': 'Invalid code'}, status=status.HTTP_400_BAD_REQUEST)
     
     if not reset_code.is_valid():
@@ -319,21 +392,23 @@ def reset_password(request):
     
     # Reset password
     user.set_password(new_password)
-    user.save()
+    user.save(update_fields=['password'])
     
-    # Mark code as used
-    reset_code.used = True
-    reset_code.save()
+    # Codes are single-use; clear this user's codes rather than keep them around
+    PasswordResetCode.objects.filter(user=user).delete()
     
     return Response({
         'message': 'Password reset successfully'
     }, status=status.HTTP_200_OK)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle])
 def refresh_token(request):
     """
     Refresh access token using refresh token
     POST /api/auth/refresh/
+    The refresh token is rotated: the response carries a new one and the
+    old one stops working
     """
     refresh_token = request.data.get('refresh_token')
     
@@ -342,30 +417,34 @@ def refresh_token(request):
             'error': 'Refresh token is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    user = get_user_from_token(refresh_token)
+    # Revokes the presented token up front, so a replay or a concurrent
+    # refresh with the same token gets a 401
+    user = consume_refresh_token(refresh_token)
     
-    if user is None:
+    if user is None or not user.is_active:
         return Response({
             'error': 'Invalid or expired refresh token'
         }, status=status.HTTP_401_UNAUTHORIZED)
     
-    # Generate new access token
+    # Generate new access token and rotate the refresh token
     new_access_token = generate_access_token(user)
+    new_refresh_token = generate_refresh_token(user)
     
     return Response({
-        'access': new_access_token
+        'access': new_access_token,
+        'refresh': new_refresh_token
     }, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@revalidate(user_etag)
 def get_current_user(request):
     """
     Get current authenticated user
     GET /api/auth/me/
     """
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(get_user_payload(request.user), status=status.HTTP_200_OK)
 
 
 @api_view(['PUT', 'PATCH'])
@@ -374,6 +453,7 @@ def update_profile(request):
     """
     Update user profile
     PUT/PATCH /api/auth/profile/
+    Send "Prefer: return=minimal" to get an empty 204 instead of the user
     """
     serializer = UpdateProfileSerializer(
         request.user,
@@ -382,10 +462,17 @@ def update_profile(request):
     )
     
     if serializer.is_valid():
-        serializer.save()
+        user = serializer.save()
+        
+        if _prefers(request, 'return=minimal'):
+            return Response(
+                status=status.HTTP_204_NO_CONTENT,
+                headers={'Preference-Applied': 'return=minimal'}
+            )
+        
         return Response({
             'message': 'Profile updated successfully',
-            'user': UserSerializer(request.user).data
+            'user': get_user_payload(user)
         }, status=status.HTTP_200_OK)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -404,22 +491,29 @@ def change_password(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     user = request.user
+    old_password = serializer.validated_data['old_password']
+    new_password = serializer.validated_data['new_password']
     
     # Check old password
-    if not user.check_password(serializer.validated_data['old_password']):
+    if not user.check_password(old_password):
         return Response({
             'old_password': 'Wrong password'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Check if new password is same as current password
-    if user.check_password(new_password):
+    # old_password was just verified as the current one, so comparing the
+    # strings answers this without hashing a second time
+    if new_password == old_password:
         return Response({
-        'error': 'New password cannot be the same as your current password'
+            'error': 'New password cannot be the same as your current password'
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    # Reset password
+    # Change password
     user.set_password(new_password)
-    user.save()
+    user.save(update_fields=['password'])
+    
+    return Response({
+        'message': 'Password changed successfully'
+    }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -431,6 +525,10 @@ def logout_user(request):
     """
     # In JWT, logout is handled on client side by deleting tokens
     # But we can log it server-side for analytics
+    refresh_token = request.data.get('refresh_token')
+    if refresh_token:
+        revoke_refresh_token(refresh_token)
+    
     return Response({
         'message': 'Logout successful'
     }, status=status.HTTP_200_OK)
@@ -450,16 +548,20 @@ def enable_2fa(request):
             'error': '2FA is already enabled'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Generate new secret
-    secret = generate_totp_secret()
+    # A pending (unverified) secret is only shown again while its QR code
+    # is still cached; after that a retried setup gets a fresh secret
+    secret = user.two_fa_secret
+    qr_code = get_cached_qr_code(user, secret) if secret else None
     
-    # Save secret (temporarily, until verified)
-    user.two_fa_secret = secret
-    user.save(update_fields=['two_fa_secret'])
-    
-    # Generate QR code
-    totp_uri = get_totp_uri(user, secret)
-    qr_code = generate_qr_code(totp_uri)
+    if qr_code is None:
+        secret = generate_totp_secret()
+        
+        # Save secret (temporarily, until verified)
+        user.two_fa_secret = secret
+        user.save(update_fields=['two_fa_secret'])
+        
+        # Generate QR code
+        qr_code = get_qr_code(user, secret)
     
     # Generate backup codes
     backup_codes = generate_backup_codes()
@@ -473,41 +575,29 @@ def enable_2fa(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle])
 def google_auth(request):
     """
     Authenticate user with Google OAuth access token
     POST /api/auth/google/
     body: { "access_token": "google_access_token" }
     """
-    print(f"Google auth request received")
-    print(f"Request data: {request.data}")
-    
     access_token = request.data.get('access_token')
     
     if not access_token:
-        print("No access_token provided")
         return Response({'error': 'Google access token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        # Verify the access token with Google
-        print(f"Verifying token with Google: {access_token[:20]}...")
-        google_response = requests.get(
-            'https://www.googleapis.com/oauth2/v3/userinfo',
-            params={'access_token': access_token}
-        )
-
-        print(f"Google API response status: {google_response.status_code}")
+        # Verify the access token with Google (cached per token)
+        user_data = get_google_userinfo(access_token)
         
-        if google_response.status_code != 200:
-            print(f"Google API error: {google_response.text}")
+        if user_data is None:
+            logger.info("Google rejected a sign-in access token")
             return Response(
                 {'error': 'Invalid Google access token'}, 
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        user_data = google_response.json()
-        print(f"Google user data received: {user_data}")
-        
         # Extract user information
         google_id = user_data.get('sub')
         email = user_data.get('email')
@@ -515,63 +605,67 @@ def google_auth(request):
         last_name = user_data.get('family_name', '')
 
         if not email:
-            print("No email in Google response")
+            logger.warning("Google userinfo for sub %s carried no email", user_data.get('sub'))
             return Response(
                 {'error': 'Email not provided by Google'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        print(f"Processing user: {email}")
-
-        # User lookup/creation logic
-        user = None
-        try:
-            # First try: Find by Google ID
-            user = User.objects.get(google_oauth_id=google_id)
-            print(f"Found existing user by Google ID: {user.email}")
-        except User.DoesNotExist:
-            try:
-                # Second try: Find by email
-                user = User.objects.get(email=email)
-                print(f"Found existing user by email: {user.email}")
-                # Link Google account if not already linked
-                if not user.google_oauth_id:
-                    user.google_oauth_id = google_id
-                    user.email_verified = True
-                    user.save()
-                    print("Linked Google account to existing user")
-            except User.DoesNotExist:
-                # Third: Create new user
-                print("Creating new user from Google data")
-                user = User.objects.create_user(
-                    email=email,
-                    password=None,  # No password for Google users
-                    first_name=first_name,
-                    last_name=last_name,
-                    google_oauth_id=google_id,
-                    # Required fields with default values
-                    age=25,  # Default age
-                    gender='N',  # Prefer not to say
-                    country='Unknown',
-                    occupation='Not specified',
-                    role='personal',
-                    is_active=True,
-                    email_verified=True,  # Google emails are verified
-                )
+        # User lookup/creation logic: one query covers both the Google ID
+        # and the email match, so returning users cost a single SELECT
+        lookup = Q(email=email.lower())
+        if google_id:
+            lookup |= Q(google_oauth_id=google_id)
+        matches = list(
+            User.objects.only(*USER_PAYLOAD_FIELDS, 'is_active', 'google_oauth_id').filter(lookup)[:2]
+        )
+        
+        # First try: the account already linked to this Google ID
+        user = next((u for u in matches if google_id and u.google_oauth_id == google_id), None)
+        if user is not None:
+            logger.debug("Google sign-in matched user %s by Google ID", user.pk)
+        elif matches:
+            # Second try: the account with this email
+            user = matches[0]
+            logger.debug("Google sign-in matched user %s by email", user.pk)
+            # Link Google account if not already linked; last_login rides
+            # along so record_login below has nothing left to write
+            if not user.google_oauth_id:
+                user.google_oauth_id = google_id
+                user.email_verified = True
+                user.last_login = timezone.now()
+                user.save(update_fields=['google_oauth_id', 'email_verified', 'last_login', 'updated_at'])
+                logger.info("Linked Google account to user %s", user.pk)
+        else:
+            # Third: Create new user
+            user = User.objects.create_user(
+                email=email,
+                password=None,  # No password for Google users
+                first_name=first_name,
+                last_name=last_name,
+                google_oauth_id=google_id,
+                # Required fields with default values
+                age=25,  # Default age
+                gender='N',  # Prefer not to say
+                country='Unknown',
+                occupation='Not specified',
+                role='personal',
+                is_active=True,
+                email_verified=True,  # Google emails are verified
+                last_login=timezone.now(),  # Saves record_login a separate UPDATE
+            )
+            logger.info("Created user %s from Google sign-in", user.pk)
 
         # Generate JWT tokens
         access_token_jwt = generate_access_token(user)
         refresh_token_str = generate_refresh_token(user)
 
         # Update last login
-        user.last_login = timezone.now()
-        user.save(update_fields=['last_login'])
-
-        print(f"Google auth successful for user: {user.email}")
+        record_login(user)
 
         return Response({
             'message': 'Google authentication successful',
-            'user': UserSerializer(user).data,
+            'user': _login_payload(request, user),
             'tokens': {
                 'access': access_token_jwt,
                 'refresh': refresh_token_str
@@ -579,13 +673,13 @@ def google_auth(request):
         }, status=status.HTTP_200_OK)
 
     except requests.RequestException as e:
-        print(f"Request exception: {e}")
+        logger.warning("Google userinfo request failed: %s", e)
         return Response(
             {'error': 'Failed to verify Google token'}, 
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
     except Exception as e:
-        print(f"General exception: {e}")
+        logger.exception("Google sign-in failed")
         return Response(
             {'error': f'Authentication failed: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -612,14 +706,14 @@ def verify_2fa(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # Verify token
-    if not verify_totp_token(user.two_fa_secret, token):
+    if not consume_totp_token(user, token):
         return Response({
             'error': 'Invalid token. Please try again.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # Enable 2FA
     user.two_fa_enabled = True
-    user.save(update_fields=['two_fa_enabled'])
+    user.save(update_fields=['two_fa_enabled', 'updated_at'])
     
     return Response({
         'message': '2FA enabled successfully!'
@@ -654,7 +748,7 @@ def disable_2fa(request):
     # Disable 2FA
     user.two_fa_enabled = False
     user.two_fa_secret = None
-    user.save(update_fields=['two_fa_enabled', 'two_fa_secret'])
+    user.save(update_fields=['two_fa_enabled', 'two_fa_secret', 'updated_at'])
     
     return Response({
         'message': '2FA disabled successfully'
@@ -663,6 +757,7 @@ def disable_2fa(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthCodeThrottle])
 def verify_2fa_login(request):
     """
     Verify 2FA token during login
@@ -677,19 +772,27 @@ def verify_2fa_login(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        user = User.objects.get(email=email.lower())
+        # Only the columns the response and the TOTP check need
+        user = User.objects.only(
+            *USER_PAYLOAD_FIELDS, 'is_active', 'two_fa_secret'
+        ).get(email=email.lower())
     except User.DoesNotExist:
         return Response({
             'error': 'User not found'
         }, status=status.HTTP_404_NOT_FOUND)
     
+    if not user.is_active:
+        return Response({
+            'error': 'Account is inactive'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
     if not user.two_fa_enabled:
         return Response({
             'error': '2FA is not enabled for this user'
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # Verify token
-    if not verify_totp_token(user.two_fa_secret, token):
+    if not consume_totp_token(user, token):
         return Response({
             'error': 'Invalid token'
         }, status=status.HTTP_400_BAD_REQUEST)
@@ -699,12 +802,11 @@ def verify_2fa_login(request):
     refresh_token_str = generate_refresh_token(user)
     
     # Update last login
-    user.last_login = timezone.now()
-    user.save(update_fields=['last_login'])
+    record_login(user)
     
     return Response({
         'message': '2FA verification successful',
-        'user': UserSerializer(user).data,
+        'user': _login_payload(request, user),
         'tokens': {
             'access': access_token,
             'refresh': refresh_token_str
@@ -713,6 +815,23 @@ def verify_2fa_login(request):
 
 # ==================== SCAN MANAGEMENT VIEWS ====================
 
+# Read/write size when streaming uploaded scans to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# How long scan records are retained (7 years)
+SCAN_RETENTION = timedelta(days=7 * 365)
+
+# Where uploads land: the storage name prefix (Scan.image_path's upload_to)
+# and the matching directory on disk
+SCAN_UPLOAD_DIR = 'scans'
+SCAN_UPLOAD_ROOT = os.path.join(settings.MEDIA_ROOT, SCAN_UPLOAD_DIR)
+
+
+def _user_scans(user):
+    """The user's scans that haven't been soft-deleted; base for every scan lookup"""
+    return Scan.objects.filter(user=user, deleted_by_user=False)
+
+
 # In your views.py, update the upload_scan function
 # Find this section and replace it:
 
@@ -733,18 +852,35 @@ def upload_scan(request):
     notes = serializer.validated_data.get('notes', '')
     
     # Generate unique filename
-    ext = os.path.splitext(image_file.name)[1]
-    filename = f"{uuid.uuid4()}{ext}"
-    filepath = os.path.join('scans', filename)
-    
-    # Save the uploaded file
-    saved_path = default_storage.save(filepath, image_file)
-    full_image_path = os.path.join(settings.MEDIA_ROOT, saved_path)
+    _, dot, ext = image_file.name.rpartition('.')
+    filename = f"{secrets.token_hex(16)}.{ext}" if dot else secrets.token_hex(16)
+    saved_path = f'{SCAN_UPLOAD_DIR}/{filename}'
+    full_image_path = os.path.join(SCAN_UPLOAD_ROOT, filename)
+    
+    os.makedirs(SCAN_UPLOAD_ROOT, exist_ok=True)
+    hasher = hashlib.sha256()
+    if hasattr(image_file, 'temporary_file_path'):
+        # Large uploads are already spooled to a temp file: hash it, then
+        # move it into place (a rename on the same filesystem) instead of copying
+        for chunk in image_file.chunks(chunk_size=UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+        file_move_safe(image_file.temporary_file_path(), full_image_path)
+    else:
+        # Stream the upload to disk, hashing it in the same pass
+        with open(full_image_path, 'xb', buffering=UPLOAD_CHUNK_SIZE) as destination:
+            for chunk in image_file.chunks(chunk_size=UPLOAD_CHUNK_SIZE):
+                destination.write(chunk)
+                hasher.update(chunk)
+    
+    # As default_storage.save would: the moved temp file is 0600, which a
+    # separate web server serving /media couldn't read
+    if settings.FILE_UPLOAD_PERMISSIONS is not None:
+        os.chmod(full_image_path, settings.FILE_UPLOAD_PERMISSIONS)
     
     try:
-        from core.ml_models.ecg_predictor import ECGPredictor
+        from core.ml_models.ecg_predictor import get_predictor
         
-        predictor = ECGPredictor()
+        predictor = get_predictor()
         prediction = predictor.predict(full_image_path)
         
         # IMPORTANT: Save the ENTIRE prediction result, not just selected fields
@@ -755,72 +891,99 @@ def upload_scan(request):
         scan = Scan.objects.create(
             user=request.user,
             image_path=saved_path,
+            image_sha256=hasher.hexdigest(),
             attention_map_path=prediction.get('attention_map_path', ''),
             risk_level=prediction['risk_level'],
             confidence_score=prediction['confidence'],
             prediction_result=prediction_result,  # Complete result with all nested data
             notes=notes,
             processing_time=prediction.get('processing_time', 0),
-            retention_until=date.today() + timedelta(days=7*365)
+            retention_until=date.today() + SCAN_RETENTION
         )
         
         return Response({
             'message': 'Scan analyzed successfully',
-            'scan': ScanSerializer(scan).data
+            'scan': serialize_scan(scan)
         }, status=status.HTTP_201_CREATED)
         
     except Exception as e:
         if default_storage.exists(saved_path):
             default_storage.delete(saved_path)
         
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Analysis error: {str(e)}")
-        print(f"Traceback: {error_details}")
+        logger.exception("Scan analysis failed")
         
         return Response({
             'error': f'Analysis failed: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _user_scans_etag(request):
+    """
+    Soft deletes bump updated_at, so the newest updated_at across all of the
+    user's scans plus the active count changes whenever the list does
+    """
+    stats = Scan.objects.filter(user=request.user).aggregate(
+        last_updated=Max('updated_at'),
+        active=Count('id', filter=Q(deleted_by_user=False))
+    )
+    last_updated = stats['last_updated'].timestamp() if stats['last_updated'] else 0
+    return f"scans-{request.user.pk}-{request.user.updated_at.timestamp()}-{last_updated}-{stats['active']}"
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@revalidate(_user_scans_etag)
 def get_user_scans(request):
     """
     Get all scans for current user (excluding soft-deleted)
     GET /api/scans/
+    Pass ?cursor= or ?page_size= to page through them instead
     """
-    scans = Scan.objects.filter(
-        user=request.user,
-        deleted_by_user=False
-    ).order_by('-created_at')
+    # Plain rows: the list is read-only, so skip building model instances
+    user_scans = _user_scans(request.user).values(*SCAN_LIST_COLUMNS)
+    user_name = request.user.get_full_name()
     
-    serializer = ScanListSerializer(scans, many=True)
+    params = request.query_params
+    if 'cursor' in params or 'page_size' in params:
+        paginator = ScanCursorPagination()
+        page = paginator.paginate_queryset(user_scans, request)
+        return paginator.get_paginated_response([serialize_scan_list(row, user_name) for row in page])
     
+    scans = [serialize_scan_list(row, user_name) for row in user_scans.order_by('-created_at')]
+    
+    # Count the evaluated rows rather than issuing a separate COUNT(*)
     return Response({
-        'count': scans.count(),
-        'scans': serializer.data
+        'count': len(scans),
+        'scans': scans
     }, status=status.HTTP_200_OK)
 
 
+def _scan_detail_etag(request, scan_id):
+    """The detail payload only changes with the scan row or the owner's name/email"""
+    updated_at = _user_scans(request.user).filter(
+        id=scan_id
+    ).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return f'scan-{scan_id}-{updated_at.timestamp()}-{request.user.updated_at.timestamp()}'
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@revalidate(_scan_detail_etag)
 def get_scan_detail(request, scan_id):
     """
     Get detailed information about a specific scan
     GET /api/scans/<id>/
     """
     try:
-        scan = Scan.objects.get(
-            id=scan_id,
-            user=request.user,
-            deleted_by_user=False
-        )
+        scan = _user_scans(request.user).select_related('user').get(id=scan_id)
     except Scan.DoesNotExist:
         return Response({
             'error': 'Scan not found'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    serializer = ScanSerializer(scan)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(serialize_scan(scan), status=status.HTTP_200_OK)
 
 
 @api_view(['DELETE'])
@@ -830,19 +993,17 @@ def delete_scan(request, scan_id):
     Soft delete a scan
     DELETE /api/scans/<id>/delete/
     """
-    try:
-        scan = Scan.objects.get(
-            id=scan_id,
-            user=request.user,
-            deleted_by_user=False
-        )
-    except Scan.DoesNotExist:
+    # Single UPDATE; no matching row means the scan doesn't exist for this user
+    now = timezone.now()
+    updated = _user_scans(request.user).filter(id=scan_id).update(
+        deleted_by_user=True, deleted_at=now, updated_at=now
+    )
+    
+    if not updated:
         return Response({
             'error': 'Scan not found'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    scan.soft_delete()
-    
     return Response({
         'message': 'Scan removed from your history'
     }, status=status.HTTP_200_OK)
@@ -855,27 +1016,27 @@ def get_scan_statistics(request):
     Get scan statistics for current user
     GET /api/scans/statistics/
     """
-    user_scans = Scan.objects.filter(
-        user=request.user,
-        deleted_by_user=False
-    )
-    
-    total_scans = user_scans.count()
-    
-    risk_counts = {
-        'low': user_scans.filter(risk_level='low').count(),
-        'moderate': user_scans.filter(risk_level='moderate').count(),
-        'high': user_scans.filter(risk_level='high').count()
-    }
-    
     week_ago = timezone.now() - timedelta(days=7)
-    recent_scans = user_scans.filter(created_at__gte=week_ago).count()
+    
+    # All counters in one aggregate query
+    stats = _user_scans(request.user).aggregate(
+        total=Count('id'),
+        low=Count('id', filter=Q(risk_level='low')),
+        moderate=Count('id', filter=Q(risk_level='moderate')),
+        high=Count('id', filter=Q(risk_level='high')),
+        recent=Count('id', filter=Q(created_at__gte=week_ago)),
+        reports=Count('id', filter=Q(report_generated=True)),
+    )
     
     return Response({
-        'total_scans': total_scans,
-        'risk_distribution': risk_counts,
-        'recent_scans_7days': recent_scans,
-        'reports_generated': user_scans.filter(report_generated=True).count()
+        'total_scans': stats['total'],
+        'risk_distribution': {
+            'low': stats['low'],
+            'moderate': stats['moderate'],
+            'high': stats['high']
+        },
+        'recent_scans_7days': stats['recent'],
+        'reports_generated': stats['reports']
     }, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
@@ -884,13 +1045,15 @@ def generate_report(request, scan_id):
     """
     Generate PDF report for a scan
     POST /api/scans/<id>/generate-report/
+    Send "Prefer: respond-async" to get a 202 right away and poll
+    report-status/ instead of waiting for the PDF to render
     """
+    if _prefers(request, 'respond-async'):
+        return _queue_report(request, scan_id)
+    
     try:
-        scan = Scan.objects.get(
-            id=scan_id,
-            user=request.user,
-            deleted_by_user=False
-        )
+        # The report and the response payload both read scan.user
+        scan = _user_scans(request.user).select_related('user').get(id=scan_id)
     except Scan.DoesNotExist:
         return Response({
             'error': 'Scan not found'
@@ -900,32 +1063,105 @@ def generate_report(request, scan_id):
     if scan.report_generated and scan.report_path:
         return Response({
             'message': 'Report already exists',
-            'report_path': scan.report_path,
-            'scan': ScanSerializer(scan).data
+            'report_path': scan.report_path.name,
+            'scan': serialize_scan(scan)
         }, status=status.HTTP_200_OK)
     
-    # Generate report
+    # Same claim the background task takes, so a duplicate request (sync
+    # or queued) can't render this scan's PDF at the same time
+    if not claim_report(scan.id):
+        return Response({
+            'error': 'Report generation already in progress'
+        }, status=status.HTTP_409_CONFLICT)
+    
     try:
+        # Generate report
         generator = ScanReportGenerator(scan)
         report_path = generator.generate_report()
         
-        # Update scan record
+        # Update scan record, releasing the claim in the same write
         scan.report_path = report_path
         scan.report_generated = True
-        scan.save(update_fields=['report_path', 'report_generated'])
+        scan.report_started_at = None
+        scan.save(update_fields=['report_path', 'report_generated', 'report_started_at', 'updated_at'])
         
         return Response({
             'message': 'Report generated successfully',
             'report_path': report_path,
-            'scan': ScanSerializer(scan).data
+            'scan': serialize_scan(scan)
         }, status=status.HTTP_201_CREATED)
     
     except Exception as e:
+        release_report(scan.id)
         return Response({
             'error': f'Failed to generate report: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _queue_report(request, scan_id):
+    """Asynchronous branch of generate_report"""
+    try:
+        scan = _user_scans(request.user).only('id', 'report_generated', 'report_path').get(id=scan_id)
+    except Scan.DoesNotExist:
+        return Response({
+            'error': 'Scan not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if scan.report_generated and scan.report_path:
+        return Response({
+            'message': 'Report already exists',
+            'status': 'ready',
+            'report_path': scan.report_path.name
+        }, status=status.HTTP_200_OK)
+    
+    status_url = reverse('api:report_status', args=[scan.id])
+    
+    if not enqueue_report(scan.id):
+        return Response({
+            'error': 'Report generation already in progress',
+            'status': REPORT_PENDING,
+            'status_url': status_url
+        }, status=status.HTTP_409_CONFLICT)
+    
+    return Response({
+        'message': 'Report generation started',
+        'status': REPORT_PENDING,
+        'status_url': status_url
+    }, status=status.HTTP_202_ACCEPTED, headers={
+        'Location': status_url,
+        'Preference-Applied': 'respond-async'
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_status(request, scan_id):
+    """
+    Poll the state of a report queued with "Prefer: respond-async"
+    GET /api/scans/<id>/report-status/
+    status is one of: ready, pending, failed, not_started
+    """
+    try:
+        scan = _user_scans(request.user).only(
+            'id', 'report_generated', 'report_path', 'report_started_at'
+        ).get(id=scan_id)
+    except Scan.DoesNotExist:
+        return Response({
+            'error': 'Scan not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if scan.report_generated and scan.report_path:
+        return Response({
+            'status': 'ready',
+            'report_path': scan.report_path.name
+        }, status=status.HTTP_200_OK)
+    
+    state = get_report_status(scan)
+    return Response({
+        'status': state if state in (REPORT_PENDING, REPORT_FAILED) else 'not_started'
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def download_report(request, scan_id):
@@ -934,11 +1170,7 @@ def download_report(request, scan_id):
     GET /api/scans/<id>/download-report/
     """
     try:
-        scan = Scan.objects.get(
-            id=scan_id,
-            user=request.user,
-            deleted_by_user=False
-        )
+        scan = _user_scans(request.user).only('id', 'report_generated', 'report_path').get(id=scan_id)
     except Scan.DoesNotExist:
         return Response({
             'error': 'Scan not found'
@@ -949,25 +1181,34 @@ def download_report(request, scan_id):
             'error': 'Report not generated yet. Generate it first.'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    # Build full file path
-    from django.http import FileResponse
-    import os
+    filename = f'CVD_Report_{scan_id}.pdf'
     
-    report_full_path = os.path.join(settings.MEDIA_ROOT, scan.report_path)
+    if settings.REPORT_ACCEL_REDIRECT_PREFIX:
+        # Behind nginx: hand the transfer to an internal location so no
+        # worker is held for it; nginx answers 404 if the file is missing
+        response = HttpResponse(content_type='application/pdf')
+        response['X-Accel-Redirect'] = settings.REPORT_ACCEL_REDIRECT_PREFIX + scan.report_path.name
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        return response
     
-    if not os.path.exists(report_full_path):
+    # No separate stat() up front; report_generated already says it should
+    # exist, so a missing file (or a directory in its place) is caught on open
+    try:
+        report_file = open(scan.report_path.path, 'rb', buffering=0)
+    except (FileNotFoundError, IsADirectoryError):
         return Response({
             'error': 'Report file not found'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    # Return file for download
-    response = FileResponse(
-        open(report_full_path, 'rb'),
+    # FileResponse sets Content-Length from the file and streams it through
+    # wsgi.file_wrapper, which uses sendfile(2) where the server supports it;
+    # an unbuffered handle keeps Python from reading ahead into a buffer first
+    return FileResponse(
+        report_file,
+        as_attachment=True,
+        filename=filename,
         content_type='application/pdf'
     )
-    response['Content-Disposition'] = f'attachment; filename="CVD_Report_{scan_id}.pdf"'
-    
-    return response
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -1006,25 +1247,18 @@ def debug_google_token(request):
         if not access_token:
             return Response({'error': 'No access token provided'}, status=400)
 
-        print(f"Debug: Testing Google token: {access_token[:20]}...")
-        
         # Test the token with Google
-        response = requests.get(
-            'https://www.googleapis.com/oauth2/v3/userinfo',
-            params={'access_token': access_token}
-        )
+        response = request_google_userinfo(access_token)
         
-        print(f"Debug: Google API response status: {response.status_code}")
+        logger.debug("Google userinfo debug check returned %s", response.status_code)
         
         if response.status_code == 200:
             user_data = response.json()
-            print(f"Debug: Google user data: {user_data}")
             return Response({
                 'status': 'valid',
                 'user_data': user_data
             })
         else:
-            print(f"Debug: Google API error: {response.text}")
             return Response({
                 'status': 'invalid', 
                 'google_status_code': response.status_code,
@@ -1032,7 +1266,7 @@ def debug_google_token(request):
             }, status=400)
             
     except Exception as e:
-        print(f"Debug: Exception: {str(e)}")
+        logger.exception("Google token debug check failed")
         return Response({'error': str(e)}, status=500)
 
 
@@ -1082,4 +1316,4 @@ def admin_delete_user(request, user_id):
         user.delete()
         return Response({'message': 'User deleted successfully'}, status=200)
     except User.DoesNotExist:
-        return Response({'error': 'User not found'}, status=404)
\ No newline at end of file
+        return Response({'error': 'User not found'}, status=404)
\ No newline at end of file
@@ -91,6 +91,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse each thread's connection across requests instead of
+        # reconnecting every time; health checks drop broken ones
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -109,6 +113,30 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Argon2 first; the bcrypt and PBKDF2 hashers stay so existing hashes still
+# verify and get upgraded on the user's next login
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+# Cache - in-process memory (swap for Redis/Memcached when running several
+# workers; login lockouts and throttles must be seen by every worker)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cvd-detect',
+        # Well above the 300 default, so lockout counters aren't culled to
+        # make room for cached payloads
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '50000'))},
+    }
+}
+
+# Upper bound on ECG model inferences running at the same time per process
+ECG_MAX_CONCURRENT_PREDICTIONS = int(os.getenv('ECG_MAX_CONCURRENT_PREDICTIONS', '1'))
+
 # Custom User Model
 AUTH_USER_MODEL = 'core.User'
 
@@ -133,6 +161,11 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Set (e.g. '/protected-media/') when nginx maps an `internal` location with
+# that prefix to MEDIA_ROOT; report downloads are then sent by nginx via
+# X-Accel-Redirect instead of being streamed by the worker
+REPORT_ACCEL_REDIRECT_PREFIX = os.getenv('REPORT_ACCEL_REDIRECT_PREFIX', '')
+
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -194,13 +227,13 @@ CORS_EXPOSE_HEADERS = [
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'core.auth.JWTAuthentication',
+        'core.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.OrjsonRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -209,6 +242,12 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Used by api.throttles on the public auth endpoints
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '20/min',
+        'auth_email': '5/min',
+        'auth_code': '10/min',
+    },
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
 }
 
@@ -231,8 +270,8 @@ FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
 # JWT Settings
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
 JWT_ALGORITHM = 'HS256'
-JWT_ACCESS_TOKEN_LIFETIME = 3600  # 1 hour in seconds
-JWT_REFRESH_TOKEN_LIFETIME = 604800  # 7 days in seconds
+JWT_ACCESS_TOKEN_LIFETIME = 900  # 15 minutes in seconds
+JWT_REFRESH_TOKEN_LIFETIME = 604800  # 7 days in seconds; rotated on every refresh
 
 # Security Settings for Production (commented out for development)
 # SECURE_SSL_REDIRECT = True
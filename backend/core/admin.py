@@ -49,6 +49,14 @@ class UserAdmin(BaseUserAdmin):
     )
     
     readonly_fields = ('created_at', 'updated_at', 'last_login')
+    
+    def get_queryset(self, request):
+        """Load only the list_display columns on the list page"""
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name == 'core_user_changelist':
+            queryset = queryset.only('id', *self.list_display)
+        return queryset
 
 
 @admin.register(Scan)
@@ -56,6 +64,7 @@ class ScanAdmin(admin.ModelAdmin):
     """Admin interface for Scan model"""
     
     list_display = ('id', 'user', 'risk_level', 'confidence_score', 'report_generated', 'deleted_by_user', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('risk_level', 'report_generated', 'deleted_by_user', 'created_at')
     search_fields = ('user__email', 'user__first_name', 'user__last_name', 'notes')
     ordering = ('-created_at',)
@@ -86,6 +95,19 @@ class ScanAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_deleted', 'restore_scans']
     
+    def get_queryset(self, request):
+        """
+        Load only the list_display columns (and the user's name and email
+        for its label) on the list page; prediction_result is never shown there
+        """
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name == 'core_scan_changelist':
+            queryset = queryset.select_related('user').only(
+                *self.list_display, 'user__email', 'user__first_name', 'user__last_name'
+            )
+        return queryset
+    
     def mark_as_deleted(self, request, queryset):
         """Admin action to soft delete scans"""
         count = queryset.update(deleted_by_user=True)
@@ -104,6 +126,7 @@ class UserPreferenceAdmin(admin.ModelAdmin):
     """Admin interface for UserPreference model"""
     
     list_display = ('user', 'theme', 'email_notifications_enabled', 'scan_completion_notifications')
+    list_select_related = ('user',)
     list_filter = ('theme', 'email_notifications_enabled')
     search_fields = ('user__email', 'user__first_name', 'user__last_name')
     
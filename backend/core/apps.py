@@ -6,15 +6,16 @@ class CoreConfig(AppConfig):
     name = "core"
 
     def ready(self):
-        """Load ML model on startup"""
+        """Connect auth cache invalidation and load ML model on startup"""
         import sys
+        from . import auth  # noqa: F401
         
         # Only load in production/development, not during migrations
         if 'runserver' in sys.argv or 'gunicorn' in sys.argv[0]:
             try:
-                from core.ml_models.ecg_predictor import ECGPredictor
+                from core.ml_models.ecg_predictor import get_predictor
                 print("Pre-loading ECG model...")
-                ECGPredictor()  # Singleton initialization
+                get_predictor()  # Singleton initialization
                 print("✓ Model pre-loaded successfully!")
             except Exception as e:
                 print(f"Warning: Could not pre-load model: {e}")
\ No newline at end of file
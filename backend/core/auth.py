@@ -2,46 +2,39 @@
 Authentication utilities for JWT token generation and validation
 """
 import jwt
+import time
+import hashlib
+import secrets
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework.authentication import BaseAuthentication
-from rest_framework.exceptions import AuthenticationFailed
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import RevokedRefreshToken
 
 User = get_user_model()
 
-class JWTAuthentication(BaseAuthentication):
-    """
-    Custom JWT Authentication for Django REST Framework
-    """
-    def authenticate(self, request):
-        auth_header = request.META.get('HTTP_AUTHORIZATION')
-        
-        if not auth_header:
-            return None
-        
-        try:
-            # Expected format: "Bearer <token>"
-            parts = auth_header.split()
-            
-            if len(parts) != 2 or parts[0].lower() != 'bearer':
-                raise AuthenticationFailed('Invalid authorization header format')
-            
-            token = parts[1]
-            
-            # Validate token and get user
-            user = get_user_from_token(token)
-            
-            if user is None:
-                raise AuthenticationFailed('Invalid or expired token')
-            
-            if not user.is_active:
-                raise AuthenticationFailed('User account is disabled')
-            
-            return (user, token)
-            
-        except Exception as e:
-            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
+# At most one sweep of expired revoked refresh tokens per this many seconds
+REVOKED_REFRESH_PURGE_INTERVAL = 3600
+
+# last_login is only rewritten once it is at least this many seconds old
+LAST_LOGIN_RESOLUTION = 60
+
+# Seconds an access-token user is reused without a SELECT. Saves and
+# deletes clear it at once; queryset updates wait out the timeout
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Columns request.user rarely needs; left deferred so the per-request user
+# (and its cached copy) carries no credentials. Views that do read them,
+# e.g. check_password, load them on first access
+AUTH_USER_DEFERRED_FIELDS = (
+    'password', 'two_fa_secret', 'verification_token',
+    'verification_token_expires', 'google_oauth_id', 'apple_oauth_id',
+)
 
 def generate_access_token(user):
     """Generate JWT access token"""
@@ -63,6 +56,7 @@ def generate_refresh_token(user):
         'user_id': str(user.id),
         'exp': datetime.utcnow() + timedelta(seconds=settings.JWT_REFRESH_TOKEN_LIFETIME),
         'iat': datetime.utcnow(),
+        'jti': secrets.token_hex(16),  # Keeps tokens issued in the same second distinct
         'type': 'refresh'
     }
     
@@ -81,14 +75,96 @@ def decode_token(token):
         return None
 
 
+def _auth_user_key(user_id):
+    return f'auth_user:{user_id}'
+
+
 def get_user_from_token(token):
-    """Get user from JWT token"""
+    """Get user from JWT access token, cached per user"""
     payload = decode_token(token)
-    if not payload:
+    if not payload or payload.get('type') != 'access':
         return None
     
+    key = _auth_user_key(payload['user_id'])
+    user = cache.get(key)
+    if user is None:
+        try:
+            user = User.objects.defer(*AUTH_USER_DEFERRED_FIELDS).get(id=payload['user_id'])
+        except User.DoesNotExist:
+            return None
+        cache.set(key, user, AUTH_USER_CACHE_TIMEOUT)
+    
+    return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_auth_user(sender, instance, **kwargs):
+    """Drop the cached user on any save (password, 2FA, deactivation) or delete"""
+    cache.delete(_auth_user_key(instance.pk))
+
+
+def _refresh_token_jti(token, payload):
+    """Token id to revoke by; tokens issued before jti existed use a hash"""
+    return payload.get('jti') or hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def _revoke(token, payload):
+    """
+    Record the token as revoked. Returns False if it already was; the
+    primary key makes this an atomic claim across workers
+    """
+    lifetime = payload['exp'] - int(time.time())
     try:
-        user = User.objects.get(id=payload['user_id'])
-        return user
+        with transaction.atomic():
+            RevokedRefreshToken.objects.create(
+                jti=_refresh_token_jti(token, payload),
+                expires_at=timezone.now() + timedelta(seconds=max(lifetime, 0))
+            )
+    except IntegrityError:
+        return False
+    
+    # Expired tokens fail decoding anyway, so their rows can go
+    if cache.add('revoked_refresh_tokens_purged', True, REVOKED_REFRESH_PURGE_INTERVAL):
+        RevokedRefreshToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    return True
+
+
+def consume_refresh_token(token):
+    """
+    Validate a refresh token and revoke it in the same step, returning its
+    user (or None). Of two concurrent refreshes with one token, only one
+    gets the user.
+    """
+    payload = decode_token(token)
+    if not payload or payload.get('type') != 'refresh':
+        return None
+    
+    if not _revoke(token, payload):
+        return None
+    
+    try:
+        return User.objects.only('id', 'email', 'is_active').get(pk=payload['user_id'])
     except User.DoesNotExist:
-        return None
\ No newline at end of file
+        return None
+
+
+def revoke_refresh_token(token):
+    """Reject a refresh token for the rest of its lifetime (on logout)"""
+    payload = decode_token(token)
+    if payload and payload.get('type') == 'refresh':
+        _revoke(token, payload)
+
+
+def record_login(user):
+    """
+    Stamp user.last_login. Repeated logins within LAST_LOGIN_RESOLUTION
+    seconds skip the UPDATE, so a burst of logins costs one write.
+    """
+    now = timezone.now()
+    if user.last_login and (now - user.last_login).total_seconds() < LAST_LOGIN_RESOLUTION:
+        return
+    
+    user.last_login = now
+    User.objects.filter(pk=user.pk).update(last_login=now)
+    forget_auth_user(User, user)
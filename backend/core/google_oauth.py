@@ -0,0 +1,58 @@
+"""
+Google OAuth helpers
+"""
+import hashlib
+import requests
+from requests.adapters import HTTPAdapter
+from django.core.cache import cache
+
+GOOGLE_USERINFO_URL = 'https://www.googleapis.com/oauth2/v3/userinfo'
+
+# Seconds a verified access token's profile is reused. Google access tokens
+# live for an hour, so this only trims repeat sign-ins with the same token
+GOOGLE_USERINFO_CACHE_TIMEOUT = 300
+
+# (connect, read) seconds; a slow Google shouldn't hold a worker for long
+GOOGLE_REQUEST_TIMEOUT = (3, 5)
+
+# Shared keep-alive session, so sign-ins reuse the TLS connection to Google
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+
+def _userinfo_cache_key(access_token):
+    """Cache key for an access token, without storing the token itself"""
+    return 'google_userinfo:' + hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+
+
+def request_google_userinfo(access_token):
+    """
+    Call Google's userinfo endpoint over the shared session and return the
+    raw response, uncached
+    """
+    return _session.get(
+        GOOGLE_USERINFO_URL,
+        params={'access_token': access_token},
+        timeout=GOOGLE_REQUEST_TIMEOUT
+    )
+
+
+def get_google_userinfo(access_token):
+    """
+    Return the Google profile for an access token, or None if Google
+    rejects it. Successful lookups are cached, so only the first sign-in
+    with a token pays the round trip to Google.
+    Raises requests.RequestException if Google can't be reached.
+    """
+    key = _userinfo_cache_key(access_token)
+    user_data = cache.get(key)
+    
+    if user_data is None:
+        response = request_google_userinfo(access_token)
+        if response.status_code != 200:
+            return None
+        
+        user_data = response.json()
+        cache.set(key, user_data, GOOGLE_USERINFO_CACHE_TIMEOUT)
+    
+    return user_data
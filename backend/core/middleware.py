@@ -4,6 +4,8 @@ Custom middleware for JWT authentication
 from django.utils.deprecation import MiddlewareMixin
 from core.auth import get_user_from_token
 
+SKIP_PATH_PREFIXES = ('/api/', '/admin/')
+
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     """
@@ -14,22 +16,10 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
         """
         Extract JWT token from Authorization header and authenticate user
         """
-        # Public endpoints that don't need JWT authentication
-        public_paths = [
-            '/api/auth/register/',
-            '/api/auth/login/',
-            '/api/auth/verify-email/',
-            '/api/auth/resend-verification/',
-            '/api/auth/forgot-password/',  
-            '/api/auth/reset-password/',    
-            '/api/auth/google/',
-            '/api/auth/2fa/login-verify/',
-            '/api/auth/refresh/',
-            '/admin/',
-        ]
-        
-        # Skip JWT check for public paths
-        if any(request.path.startswith(path) for path in public_paths):
+        # DRF authenticates /api/ itself (core.authentication.JWTAuthentication);
+        # doing it here too would decode the token and load the user twice.
+        # The admin uses its session login.
+        if request.path.startswith(SKIP_PATH_PREFIXES):
             return None
         
         # Get authorization header
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-15 09:12
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def lowercase_emails(apps, schema_editor):
+    User = apps.get_model("core", "User")
+    User.objects.update(email=django.db.models.functions.text.Lower("email"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_passwordresetcode"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="users_email_lower_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-15 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_user_email_lower_uniq"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="scan",
+            name="scans_user_id_88c9d6_idx",
+        ),
+        migrations.AddIndex(
+            model_name="scan",
+            index=models.Index(
+                fields=["user", "deleted_by_user", "-created_at"],
+                name="scan_user_active_created_idx",
+            ),
+        ),
+    ]
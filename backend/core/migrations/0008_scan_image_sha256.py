@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-15 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_scan_user_active_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scan",
+            name="image_sha256",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="scan",
+            index=models.Index(
+                fields=["user", "image_sha256"], name="scan_user_sha256_idx"
+            ),
+        ),
+    ]
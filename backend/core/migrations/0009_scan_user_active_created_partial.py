@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-15 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_scan_image_sha256"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="scan",
+            name="scan_user_active_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="scan",
+            index=models.Index(
+                condition=models.Q(("deleted_by_user", False)),
+                fields=["user", "-created_at"],
+                name="scan_user_active_created_idx",
+            ),
+        ),
+    ]
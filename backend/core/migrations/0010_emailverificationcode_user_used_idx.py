@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-15 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_scan_user_active_created_partial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emailverificationcode",
+            index=models.Index(
+                fields=["user", "used", "-created_at"],
+                name="email_code_user_used_idx",
+            ),
+        ),
+    ]
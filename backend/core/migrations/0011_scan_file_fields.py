@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-15 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_emailverificationcode_user_used_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="scan",
+            name="image_path",
+            field=models.ImageField(max_length=500, upload_to="scans/"),
+        ),
+        migrations.AlterField(
+            model_name="scan",
+            name="report_path",
+            field=models.FileField(
+                blank=True, max_length=500, null=True, upload_to="reports/"
+            ),
+        ),
+    ]
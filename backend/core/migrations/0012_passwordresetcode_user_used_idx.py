@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-15 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_scan_file_fields"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="passwordresetcode",
+            index=models.Index(
+                fields=["user", "used", "-created_at"],
+                name="reset_code_user_used_idx",
+            ),
+        ),
+    ]
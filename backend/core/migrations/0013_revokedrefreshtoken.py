@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-16 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_passwordresetcode_user_used_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedRefreshToken",
+            fields=[
+                (
+                    "jti",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "verbose_name": "Revoked Refresh Token",
+                "verbose_name_plural": "Revoked Refresh Tokens",
+                "db_table": "revoked_refresh_tokens",
+            },
+        ),
+    ]
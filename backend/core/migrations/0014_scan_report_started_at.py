@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_revokedrefreshtoken"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scan",
+            name="report_started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_scan_report_started_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="two_fa_last_step",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
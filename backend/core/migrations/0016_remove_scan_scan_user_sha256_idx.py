@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-16 12:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_user_two_fa_last_step"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="scan",
+            name="scan_user_sha256_idx",
+        ),
+    ]
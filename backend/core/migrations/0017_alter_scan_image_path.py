@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_remove_scan_scan_user_sha256_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="scan",
+            name="image_path",
+            field=models.FileField(max_length=500, upload_to="scans/"),
+        ),
+    ]
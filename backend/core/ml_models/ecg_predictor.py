@@ -5,6 +5,7 @@ from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 import cv2
 from pathlib import Path
+import threading
 import time
 import os
 from django.conf import settings
@@ -302,11 +303,16 @@ class ECGPredictor:
     RISK_MAPPING = {'MI_Patient': 'high', 'MI_History': 'moderate', 'Normal': 'low'}
     
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialize_model()
+            # Two first requests must not both load the weights
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialize_model()
+                    cls._instance = instance
         return cls._instance
 
     def _initialize_model(self):
@@ -328,6 +334,11 @@ class ECGPredictor:
         self._model.to(self._device)
         self._model.eval()
         self._processor = ViTImageProcessor.from_pretrained('google/vit-base-patch16-224')
+        # Each torch call already fans out over all cores; running several
+        # at once from request threads only thrashes the CPU
+        self._inference_slots = threading.BoundedSemaphore(
+            getattr(settings, 'ECG_MAX_CONCURRENT_PREDICTIONS', 1)
+        )
         print("Model loaded successfully")
 
     def _remap_prediction(self, old_idx, probs):
@@ -338,6 +349,10 @@ class ECGPredictor:
         return self.CLASS_NAMES[old_idx - 1], float(probs[old_idx]), old_idx
 
     def predict(self, image_path):
+        with self._inference_slots:
+            return self._predict(image_path)
+
+    def _predict(self, image_path):
         start_time = time.time()
         image_path = str(image_path)
 
@@ -499,4 +514,9 @@ class ECGPredictor:
                  'territory': lead_analysis[l]['territory']}
                 for l in all_key_leads[:4]
             ]
-        }
\ No newline at end of file
+        }
+
+
+def get_predictor():
+    """Process-wide ECGPredictor; the model is loaded on first use and kept resident"""
+    return ECGPredictor._instance or ECGPredictor()
@@ -4,6 +4,7 @@ Core models for CVD Detection System
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Lower
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
@@ -17,7 +18,8 @@ class UserManager(BaseUserManager):
         if not email:
             raise ValueError('Users must have an email address')
         
-        email = self.normalize_email(email)
+        # Store emails lowercased so exact lookups on the lowered input hit the index
+        email = self.normalize_email(email).lower()
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
@@ -77,6 +79,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     # 2FA fields
     two_fa_enabled = models.BooleanField(default=False)
     two_fa_secret = models.CharField(max_length=32, blank=True, null=True)
+    two_fa_last_step = models.PositiveBigIntegerField(blank=True, null=True)  # Last accepted TOTP time step; blocks replays
     
     # Email verification fields
     email_verified = models.BooleanField(default=False)
@@ -102,6 +105,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='users_email_lower_uniq'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
@@ -144,6 +150,10 @@ class EmailVerificationCode(models.Model):
         verbose_name = 'Email Verification Code'
         verbose_name_plural = 'Email Verification Codes'
         ordering = ['-created_at']
+        indexes = [
+            # verify_email looks up a user's active code
+            models.Index(fields=['user', 'used', '-created_at'], name='email_code_user_used_idx'),
+        ]
     
     def __str__(self):
         return f"Code for {self.user.email}"
@@ -171,10 +181,28 @@ class PasswordResetCode(models.Model):
         verbose_name = 'Password Reset Code'
         verbose_name_plural = 'Password Reset Codes'
         ordering = ['-created_at']
+        indexes = [
+            # reset_password looks up a user's active code
+            models.Index(fields=['user', 'used', '-created_at'], name='reset_code_user_used_idx'),
+        ]
     
     def __str__(self):
         return f"Reset code for {self.user.email}"
 
+class RevokedRefreshToken(models.Model):
+    """Refresh token that was rotated or logged out, kept until it expires"""
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        db_table = 'revoked_refresh_tokens'
+        verbose_name = 'Revoked Refresh Token'
+        verbose_name_plural = 'Revoked Refresh Tokens'
+    
+    def __str__(self):
+        return f"Revoked refresh token {self.jti}"
+
+
 class Scan(models.Model):
     """Medical scan model"""
     
@@ -188,9 +216,10 @@ class Scan(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scans')
     
     # File paths
-    image_path = models.CharField(max_length=500)
+    image_path = models.FileField(upload_to='scans/', max_length=500)  # Not ImageField: DICOM uploads aren't Pillow images
+    image_sha256 = models.CharField(max_length=64, blank=True, default='')  # Integrity check of the stored image
     attention_map_path = models.CharField(max_length=500, blank=True, null=True)
-    report_path = models.CharField(max_length=500, blank=True, null=True)
+    report_path = models.FileField(upload_to='reports/', max_length=500, blank=True, null=True)
     
     # Prediction results
     risk_level = models.CharField(max_length=20, choices=RISK_LEVELS)
@@ -203,6 +232,7 @@ class Scan(models.Model):
     
     # Report generation
     report_generated = models.BooleanField(default=False)
+    report_started_at = models.DateTimeField(blank=True, null=True)  # Render claim; see api.tasks
     
     # Soft delete
     deleted_by_user = models.BooleanField(default=False)
@@ -221,7 +251,13 @@ class Scan(models.Model):
         verbose_name_plural = 'Scans'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['user', '-created_at']),
+            # Matches the user-facing scan queries: user + not deleted, newest
+            # first; partial, so soft-deleted rows aren't indexed at all
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(deleted_by_user=False),
+                name='scan_user_active_created_idx',
+            ),
             models.Index(fields=['deleted_by_user']),
         ]
     
@@ -232,13 +268,13 @@ class Scan(models.Model):
         """Soft delete - hide from user view"""
         self.deleted_by_user = True
         self.deleted_at = timezone.now()
-        self.save()
+        self.save(update_fields=['deleted_by_user', 'deleted_at'])
     
     def restore(self):
         """Restore soft-deleted scan"""
         self.deleted_by_user = False
         self.deleted_at = None
-        self.save()
+        self.save(update_fields=['deleted_by_user', 'deleted_at'])
     
     def get_lead_analysis(self):
         """Get lead analysis data from prediction_result"""
@@ -223,7 +223,7 @@ class ScanReportGenerator:
         elements.append(title)
         
         # Original ECG image
-        original_img_path = Path(settings.MEDIA_ROOT) / self.scan.image_path
+        original_img_path = Path(self.scan.image_path.path)
         if original_img_path.exists():
             img = Image(str(original_img_path), width=5*inch, height=3*inch, kind='proportional')
             elements.append(img)
@@ -1,3 +1,49 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import pyotp
+from django.test import SimpleTestCase
+
+from core import two_factor
+from core.two_factor import verify_totp_token
+
+
+class VerifyTotpTokenTests(SimpleTestCase):
+    """verify_totp_token is a hand-written RFC 6238 check; pin it to pyotp"""
+
+    secret = 'JBSWY3DPEHPK3PXP'
+    now = 1_760_000_000
+
+    def verify_at(self, token, when):
+        with mock.patch.object(two_factor.time, 'time', return_value=when):
+            return verify_totp_token(self.secret, token)
+
+    def test_matches_pyotp_across_the_window(self):
+        totp = pyotp.TOTP(self.secret)
+        for step in range(200):
+            when = self.now + step * 7
+            for offset in (-30, 0, 30):
+                code = totp.at(when + offset)
+                with self.subTest(when=when, offset=offset):
+                    self.assertTrue(self.verify_at(code, when))
+
+    def test_rejects_codes_outside_the_window(self):
+        totp = pyotp.TOTP(self.secret)
+        when = self.now - self.now % 30
+        for offset in (-60, 60):
+            code = totp.at(when + offset)
+            if code in {totp.at(when - 30), totp.at(when), totp.at(when + 30)}:
+                continue
+            with self.subTest(offset=offset):
+                self.assertFalse(self.verify_at(code, when))
+
+    def test_rejects_malformed_tokens(self):
+        code = pyotp.TOTP(self.secret).at(self.now)
+        for token in ('', code[:-1], code + '0', 'abcdef', '12345a', ' ' + code[1:], '١٢٣٤٥٦'):
+            with self.subTest(token=token):
+                self.assertFalse(self.verify_at(token, self.now))
+
+    def test_rejects_missing_secret(self):
+        code = pyotp.TOTP(self.secret).at(self.now)
+        with mock.patch.object(two_factor.time, 'time', return_value=self.now):
+            self.assertFalse(verify_totp_token(None, code))
+            self.assertFalse(verify_totp_token('', code))
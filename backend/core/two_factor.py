@@ -5,6 +5,22 @@ import pyotp
 import qrcode
 from io import BytesIO
 import base64
+import hashlib
+import hmac
+import struct
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+
+User = get_user_model()
+
+# RFC 6238 parameters, matching pyotp's defaults used for provisioning
+TOTP_DIGITS = 6
+TOTP_INTERVAL = 30
+
+# Seconds a rendered setup QR code is kept
+QR_CODE_CACHE_TIMEOUT = 300
 
 
 def generate_totp_secret():
@@ -43,13 +59,86 @@ def generate_qr_code(totp_uri):
     return f"data:image/png;base64,{img_str}"
 
 
+def _qr_code_cache_key(user, secret):
+    """Cache key for a setup QR code; only carries a hash of the secret"""
+    secret_hash = hashlib.blake2b(secret.encode(), digest_size=8).hexdigest()
+    return f'2fa_qr:{user.pk}:{secret_hash}'
+
+
+def get_qr_code(user, secret):
+    """
+    QR code for the user's TOTP secret, cached so a retried setup
+    doesn't re-render the PNG
+    """
+    return cache.get_or_set(
+        _qr_code_cache_key(user, secret),
+        lambda: generate_qr_code(get_totp_uri(user, secret)),
+        QR_CODE_CACHE_TIMEOUT
+    )
+
+
+def get_cached_qr_code(user, secret):
+    """
+    The QR code rendered for this secret, or None once QR_CODE_CACHE_TIMEOUT
+    has passed since it was first shown
+    """
+    return cache.get(_qr_code_cache_key(user, secret))
+
+
 def verify_totp_token(secret, token):
     """
     Verify a TOTP token against the secret
     Returns True if valid, False otherwise
     """
-    totp = pyotp.TOTP(secret)
-    return totp.verify(token, valid_window=1)
+    return _matching_step(secret, token) is not None
+
+
+def _matching_step(secret, token):
+    """The time step (counter) `token` is valid for, or None"""
+    if not secret:
+        return None
+    
+    token = str(token)
+    if len(token) != TOTP_DIGITS or not (token.isascii() and token.isdigit()):
+        return None
+    
+    key = base64.b32decode(secret.upper() + '=' * (-len(secret) % 8))
+    counter = int(time.time()) // TOTP_INTERVAL
+    token = token.encode()
+    
+    # Check every step in the window so timing doesn't reveal which one matched
+    matched = None
+    for step in (counter - 1, counter, counter + 1):
+        if hmac.compare_digest(_hotp(key, step), token):
+            matched = step
+    return matched
+
+
+def consume_totp_token(user, token):
+    """
+    Verify a TOTP token for `user` and record its time step, so neither
+    that code nor any earlier one can be used again (RFC 6238 section 5.2).
+    Returns True only for the first successful use. The conditional UPDATE
+    is atomic in the database, so this holds across worker processes.
+    """
+    step = _matching_step(user.two_fa_secret, token)
+    if step is None:
+        return False
+    
+    return bool(
+        User.objects.filter(
+            Q(two_fa_last_step__isnull=True) | Q(two_fa_last_step__lt=step),
+            pk=user.pk
+        ).update(two_fa_last_step=step)
+    )
+
+
+def _hotp(key, counter):
+    """RFC 4226 HOTP value for `counter`, as ASCII bytes"""
+    digest = hmac.new(key, struct.pack('>Q', counter), hashlib.sha1).digest()
+    offset = digest[-1] & 0x0F
+    code = (struct.unpack('>I', digest[offset:offset + 4])[0] & 0x7FFFFFFF) % 10 ** TOTP_DIGITS
+    return b'%0*d' % (TOTP_DIGITS, code)
 
 
 def generate_backup_codes(count=8):
@@ -1,13 +1,52 @@
 # backend/utils/email_utils.py
 
-import random
+import logging
+import secrets
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from django.core.mail import send_mail
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+# Outgoing mail runs on this pool so SMTP round-trips stay off the request
+_email_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email')
+
+# Attempts per message; waits 2s, 4s, ... between them
+EMAIL_MAX_ATTEMPTS = 3
+
 
 def generate_6_digit_code():
     """Generate a random 6-digit verification code"""
-    return str(random.randint(100000, 999999))
+    return str(100000 + secrets.randbelow(900000))
+
+
+def _send_with_retry(send, *args):
+    """Call a send_* helper, retrying on SMTP/connection failures"""
+    for attempt in range(1, EMAIL_MAX_ATTEMPTS + 1):
+        try:
+            # Some helpers swallow errors and return False instead of raising
+            if send(*args) is not False:
+                return
+        except (smtplib.SMTPException, OSError) as e:
+            logger.warning("%s attempt %d failed: %s", send.__name__, attempt, e)
+        except Exception:
+            logger.exception("%s failed", send.__name__)
+            return
+        
+        if attempt < EMAIL_MAX_ATTEMPTS:
+            time.sleep(2 ** attempt)
+    
+    logger.error("%s gave up after %d attempts", send.__name__, EMAIL_MAX_ATTEMPTS)
+
+
+def send_email_in_background(send, *args):
+    """
+    Queue one of the send_* helpers below on the email pool and return
+    immediately, e.g. send_email_in_background(send_verification_code_email, email, code)
+    """
+    _email_executor.submit(_send_with_retry, send, *args)
 
 
 def send_verification_code_email(email, code):
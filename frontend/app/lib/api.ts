@@ -75,6 +75,33 @@ apiClient.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// One refresh at a time: refresh tokens are single-use, so requests that
+// fail together (e.g. the dashboard's parallel loads) wait on the same call
+let refreshPromise: Promise<string> | null = null;
+
+const refreshAccessToken = (refreshToken: string): Promise<string> => {
+  if (!refreshPromise) {
+    refreshPromise = axios
+      .post(`${API_BASE_URL}/auth/refresh/`, { refresh_token: refreshToken })
+      .then((response) => {
+        const { access, refresh } = response.data;
+        if (!access) {
+          throw new Error('No access token in refresh response');
+        }
+        setToken('accessToken', access);
+        // Refresh tokens are rotated; the old one no longer works
+        if (refresh) {
+          setToken('refreshToken', refresh);
+        }
+        return access;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // Response interceptor for token refresh
 apiClient.interceptors.response.use(
   (response) => response,
@@ -85,30 +112,28 @@ apiClient.interceptors.response.use(
     if (error.response?.status === 401 && !originalRequest._retry) {
       originalRequest._retry = true;
 
+      const refreshToken = getToken('refreshToken'); // ✅ NOW CHECKS BOTH STORAGES
+
       try {
-        const refreshToken = getToken('refreshToken'); // ✅ NOW CHECKS BOTH STORAGES
-        
         if (refreshToken) {
-          const response = await axios.post(`${API_BASE_URL}/auth/refresh/`, {
-            refresh_token: refreshToken,
-          });
-
-          const { access } = response.data;
-          
-          if (access) {
-            setToken('accessToken', access); // ✅ STORES IN CORRECT LOCATION
-
-            // Retry original request with new token
-            originalRequest.headers.Authorization = `Bearer ${access}`;
-            return apiClient(originalRequest);
-          } else {
-            throw new Error('No access token in refresh response');
-          }
+          const access = await refreshAccessToken(refreshToken);
+
+          // Retry original request with new token
+          originalRequest.headers.Authorization = `Bearer ${access}`;
+          return apiClient(originalRequest);
         } else {
           console.warn('No refresh token available');
           throw new Error('No refresh token');
         }
       } catch (refreshError) {
+        // Another tab may have rotated the token first; use its tokens
+        const currentRefresh = getToken('refreshToken');
+        const currentAccess = getToken('accessToken');
+        if (refreshToken && currentAccess && currentRefresh && currentRefresh !== refreshToken) {
+          originalRequest.headers.Authorization = `Bearer ${currentAccess}`;
+          return apiClient(originalRequest);
+        }
+
         console.error('Token refresh failed:', refreshError);
         // Refresh failed, clear tokens and redirect to login
         removeToken('accessToken'); // ✅ REMOVES FROM BOTH STORAGES
@@ -130,7 +155,8 @@ apiClient.interceptors.response.use(
 export const authAPI = {
   register: (data: any) => apiClient.post('/auth/register/', data),
   login: (data: any) => apiClient.post('/auth/login/', data),
-  logout: () => apiClient.post('/auth/logout/'),
+  // Sends the refresh token so the server revokes it
+  logout: () => apiClient.post('/auth/logout/', { refresh_token: getToken('refreshToken') }),
   getCurrentUser: () => apiClient.get('/auth/me/'),
   updateProfile: (data: any) => apiClient.patch('/auth/profile/', data),
   changePassword: (data: any) => apiClient.post('/auth/change-password/', data),